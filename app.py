@@ -1,47 +1,91 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash, make_response
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_caching import Cache
 from flask_compress import Compress
 from werkzeug.security import generate_password_hash, check_password_hash
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo import MongoClient, IndexModel, ReturnDocument, UpdateOne, ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError
+from pymongo.write_concern import WriteConcern
 from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from bson.son import SON
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, defaultdict
+import threading
+import atexit
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
+import cloudinary.exceptions
+import cloudinary.utils
 from dotenv import load_dotenv
 import os
 import re
+import time
+import random
+import hashlib
+import orjson
 from functools import wraps, lru_cache
 
 # Load environment variables
 load_dotenv()
 
+def dump_json(obj):
+    """Serialize to JSON bytes; ObjectIds and other unknown types fall back to str()"""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC)
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, which serializes several times faster than stdlib json"""
+    def dumps(self, obj, **kwargs):
+        return dump_json(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-secret-key-change-this')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
 # CORS configuration
 CORS(app)
 
-# Enable Gzip Compression
+# Enable Brotli/Gzip Compression for pages and JSON payloads over 500 bytes.
+# Registered before add_header, so it runs after it and sees the final headers.
+app.config['COMPRESS_MIMETYPES'] = ['text/html', 'text/css', 'application/javascript', 'application/json']
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
 Compress(app)
 
-# Cache configuration
-cache = Cache(app, config={
-    'CACHE_TYPE': 'simple',
-    'CACHE_DEFAULT_TIMEOUT': 300  # 5 minutes
-})
+# Shared Redis instance so cache entries and rate limits are shared across workers
+REDIS_URL = os.getenv('REDIS_URL')
+
+# Cache configuration (falls back to a per-process cache when Redis isn't configured)
+if REDIS_URL:
+    cache_config = {
+        'CACHE_TYPE': 'RedisCache',
+        'CACHE_REDIS_URL': REDIS_URL,
+        'CACHE_DEFAULT_TIMEOUT': 300,  # 5 minutes
+        'CACHE_KEY_PREFIX': 'cp:'
+    }
+else:
+    cache_config = {
+        'CACHE_TYPE': 'SimpleCache',
+        'CACHE_DEFAULT_TIMEOUT': 300  # 5 minutes
+    }
+cache = Cache(app, config=cache_config)
 
 # Rate limiting
 limiter = Limiter(
     app=app,
     key_func=get_remote_address,
     default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://"
+    storage_uri=REDIS_URL or "memory://"
 )
 
 # MongoDB configuration with connection pooling
@@ -64,20 +108,168 @@ roadmaps_collection = db['roadmaps']
 websites_collection = db['websites']
 ads_collection = db['advertisements']
 ad_clicks_collection = db['ad_clicks']
+# Jobs, workshops, courses and hackathons mirrored into one collection for search
+content_collection = db['content']
+# Ad counters are approximate telemetry, so their writes skip the acknowledgement wait
+ads_telemetry_collection = ads_collection.with_options(write_concern=WriteConcern(w=0))
+
+# Index definitions, created by ensure_indexes() rather than at import time
+# (background=True is the default on MongoDB 4.2+, passed for older servers).
+# Filter indexes follow Equality, Sort, Range order: the filtered field, then the
+# (posted_at, _id) sort that also serves date ranges and keyset pagination.
+INDEXES = [
+    (users_collection, [
+        IndexModel([('email', ASCENDING)], unique=True, background=True),
+        IndexModel([('created_at', DESCENDING), ('_id', DESCENDING)], background=True)
+    ]),
+    (jobs_collection, [
+        IndexModel([('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('job_type', ASCENDING), ('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('required_experience', ASCENDING), ('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('location_lc', ASCENDING), ('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('company_name', 'text'), ('role', 'text'), ('description', 'text')], background=True)
+    ]),
+    (workshops_collection, [
+        IndexModel([('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('price', ASCENDING), ('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('location_lc', ASCENDING), ('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('name', 'text'), ('organizer', 'text')], background=True)
+    ]),
+    (courses_collection, [
+        IndexModel([('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('price', ASCENDING), ('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('location_lc', ASCENDING), ('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('name', 'text'), ('instructor', 'text')], background=True)
+    ]),
+    (hackathons_collection, [
+        IndexModel([('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('price', ASCENDING), ('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('location_lc', ASCENDING), ('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('name', 'text'), ('organizer', 'text')], background=True)
+    ]),
+    (roadmaps_collection, [
+        IndexModel([('posted_at', DESCENDING), ('_id', DESCENDING)], background=True)
+    ]),
+    (websites_collection, [
+        IndexModel([('posted_at', DESCENDING), ('_id', DESCENDING)], background=True)
+    ]),
+    (content_collection, [
+        IndexModel([('type', ASCENDING), ('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        IndexModel([('company_name', 'text'), ('role', 'text'), ('description', 'text'),
+                    ('name', 'text'), ('organizer', 'text'), ('instructor', 'text')], background=True)
+    ]),
+    (ads_collection, [
+        IndexModel([('active', ASCENDING), ('clicks', ASCENDING)], background=True),
+        IndexModel([('posted_at', DESCENDING), ('_id', DESCENDING)], background=True),
+        # Unique, so concurrent promote upserts cannot both insert; manual ads have no reference
+        IndexModel([('content_reference', ASCENDING)], unique=True, background=True,
+                   partialFilterExpression={'content_reference': {'$exists': True}})
+    ])
+]
+
+# Index hinted for each filter shape (the set of filtered fields), so the planner never
+# trials the alternatives; shapes combining several filters are left to the planner
+FILTER_FIELDS = ('job_type', 'required_experience', 'price', 'location_lc')
+INDEXED_FILTER_FIELDS = {
+    'jobs': ('job_type', 'required_experience', 'location_lc'),
+    'workshops': ('price', 'location_lc'),
+    'courses': ('price', 'location_lc'),
+    'hackathons': ('price', 'location_lc')
+}
+FILTER_HINTS = {
+    content_type: {
+        frozenset(): [('posted_at', DESCENDING), ('_id', DESCENDING)],
+        **{
+            frozenset([field]): [(field, ASCENDING), ('posted_at', DESCENDING), ('_id', DESCENDING)]
+            for field in fields
+        }
+    }
+    for content_type, fields in INDEXED_FILTER_FIELDS.items()
+}
+
+INDEX_PROBE_TIMEOUT = 300  # workers notice indexes created by a later init-db within this
+
+def dedupe_ads():
+    """Keep one ad per promoted content so the unique content_reference index can build"""
+    collection_map = {
+        'jobs': jobs_collection,
+        'workshops': workshops_collection,
+        'courses': courses_collection,
+        'hackathons': hackathons_collection
+    }
+    duplicates = ads_collection.aggregate([
+        {'$match': {'content_reference': {'$exists': True}}},
+        {'$sort': {'_id': 1}},
+        {'$group': {
+            '_id': '$content_reference',
+            'ads': {'$push': {'_id': '$_id', 'clicks': '$clicks', 'impressions': '$impressions'}},
+            'content_type': {'$first': '$content_type'}
+        }},
+        {'$match': {'ads.1': {'$exists': True}}}
+    ])
+    for group in duplicates:
+        kept, *extra = group['ads']
+        keep = kept['_id']
+        extra_ids = [ad['_id'] for ad in extra]
+        app.logger.warning("Merging duplicate ads %s into %s for content %s", extra_ids, keep, group['_id'])
+        
+        # Fold the duplicates' telemetry into the kept ad before removing them
+        ads_collection.update_one({'_id': keep}, {'$inc': {
+            'clicks': sum(ad.get('clicks') or 0 for ad in extra),
+            'impressions': sum(ad.get('impressions') or 0 for ad in extra)
+        }})
+        ad_clicks_collection.update_many({'ad_id': {'$in': extra_ids}}, {'$set': {'ad_id': keep}})
+        ads_collection.delete_many({'_id': {'$in': extra_ids}})
+        if group['content_type'] in collection_map:
+            collection_map[group['content_type']].update_one(
+                {'_id': group['_id']},
+                {'$set': {'has_ad': True, 'ad_id': keep}}
+            )
+    
+    # Replace the earlier non-unique index on the same key
+    existing = ads_collection.index_information().get('content_reference_1')
+    if existing and not existing.get('unique'):
+        ads_collection.drop_index('content_reference_1')
+
+def ensure_indexes():
+    """Create all indexes, one create_indexes round-trip per collection"""
+    dedupe_ads()
+    for collection, indexes in INDEXES:
+        collection.create_indexes(indexes)
+    cache.delete_memoized(index_keys)
+
+@cache.memoize(timeout=INDEX_PROBE_TIMEOUT)
+def index_keys(collection_name):
+    """Key specs of a collection's indexes, re-probed every few minutes"""
+    return [list(index['key'].items()) for index in db[collection_name].list_indexes()]
+
+def has_text_index(collection_name):
+    """Whether a collection has a text index"""
+    return any('text' in dict(keys).values() for keys in index_keys(collection_name))
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Create MongoDB indexes (run once per deploy)"""
+    ensure_indexes()
+    print('Indexes created.')
 
-# Create comprehensive indexes for better performance
-users_collection.create_index([('email', ASCENDING)], unique=True)
-jobs_collection.create_index([('posted_at', DESCENDING)])
-jobs_collection.create_index([('job_type', ASCENDING), ('posted_at', DESCENDING)])
-jobs_collection.create_index([('location', ASCENDING), ('posted_at', DESCENDING)])
-jobs_collection.create_index([('company_name', 'text'), ('role', 'text'), ('description', 'text')])
-workshops_collection.create_index([('posted_at', DESCENDING)])
-workshops_collection.create_index([('name', 'text'), ('organizer', 'text')])
-courses_collection.create_index([('posted_at', DESCENDING)])
-courses_collection.create_index([('name', 'text'), ('instructor', 'text')])
-hackathons_collection.create_index([('posted_at', DESCENDING)])
-hackathons_collection.create_index([('name', 'text'), ('organizer', 'text')])
-ads_collection.create_index([('active', ASCENDING), ('clicks', ASCENDING)])
+@app.cli.command('backfill-location')
+def backfill_location_command():
+    """Populate location_lc on documents written before it was stored"""
+    for collection in (jobs_collection, workshops_collection, courses_collection, hackathons_collection):
+        result = collection.update_many(
+            {'location': {'$type': 'string'}, 'location_lc': {'$exists': False}},
+            [{'$set': {'location_lc': {'$toLower': '$location'}}}]
+        )
+        print(f'{collection.name}: {result.modified_count} documents updated.')
+
+@app.cli.command('migrate-content')
+def migrate_content_command():
+    """Copy existing listings into the unified content collection"""
+    for content_type in CONTENT_TYPE_NAMES:
+        mirror_content(content_type, {})
+        count = content_collection.count_documents({'type': CONTENT_TYPE_NAMES[content_type]})
+        print(f'{content_type}: {count} documents in {content_collection.name}.')
 
 # Cloudinary configuration with optimization defaults
 cloudinary.config(
@@ -85,14 +277,79 @@ cloudinary.config(
     api_key=os.getenv('CLOUDINARY_API_KEY'),
     api_secret=os.getenv('CLOUDINARY_API_SECRET')
 )
+CLOUDINARY_FOLDER = 'community_platform'
+CLOUDINARY_TRANSFORMATION = 'c_limit,w_800,q_auto:good'
+# Direct browser uploads are only accepted when they point at our own account
+CLOUDINARY_URL_PREFIX = f"https://res.cloudinary.com/{os.getenv('CLOUDINARY_CLOUD_NAME')}/"
 
 # Admin credentials
 ADMIN_USERNAME = os.getenv('ADMIN_USERNAME', 'admin')
 ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', 'admin123')
+# Hashed once at startup so admin logins are never compared in plaintext
+ADMIN_PASSWORD_HASH = generate_password_hash(ADMIN_PASSWORD, method='scrypt')
 
 # Constants
 ITEMS_PER_PAGE = 30
 CACHE_TIMEOUT = 300  # 5 minutes
+QUERY_CACHE_TIMEOUT = 60  # filter and search results
+# Search the unified content collection (run `flask --app app migrate-content` first)
+UNIFIED_SEARCH = os.getenv('UNIFIED_SEARCH', '').lower() in ('1', 'true', 'yes')
+COUNT_CACHE_TIMEOUT = 600  # approximate collection sizes
+MAX_PAGES = 200  # deepest legacy ?page= offset served with skip
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+COMPRESSED_ETAG_SUFFIX = re.compile(r':(?:br|gzip|deflate)$')
+XSS_TABLE = str.maketrans({'<': '&lt;', '>': '&gt;'})  # Escape in a single pass
+
+# Form fields accepted per content type (anything else in the form is ignored)
+CONTENT_FIELDS = {
+    'jobs': ('company_name', 'role', 'official_link', 'stipend_salary', 'location',
+             'job_type', 'required_experience', 'description', 'requirements'),
+    'workshops': ('name', 'official_link', 'price', 'price_amount', 'location'),
+    'courses': ('name', 'official_link', 'price', 'price_amount'),
+    'hackathons': ('name', 'official_link', 'price', 'price_amount', 'location', 'prize_pool', 'team_size'),
+    'roadmaps': ('title', 'domain', 'roadmap_link', 'description', 'difficulty'),
+    'websites': ('name', 'link', 'description'),
+    'ads': ('title', 'ad_type', 'link', 'position')
+}
+# Fields rendered by the listing cards, projected for filter and search results
+CARD_FIELDS = {
+    'jobs': ('company_name', 'role', 'job_type', 'location', 'required_experience',
+             'stipend_salary', 'description', 'image', 'posted_at'),
+    'workshops': ('name', 'domain', 'price', 'price_amount', 'certification', 'organizer',
+                  'location', 'duration', 'description', 'image', 'posted_at'),
+    'courses': ('name', 'domain', 'price', 'price_amount', 'certification', 'organizer',
+                'location', 'duration', 'description', 'image', 'posted_at'),
+    'hackathons': ('name', 'domain', 'price', 'location', 'prize_pool', 'description',
+                   'image', 'official_link', 'posted_at')
+}
+# updated_at rides along so API ETags change when a listing is edited
+CARD_PROJECTIONS = {content_type: dict.fromkeys(fields + ('updated_at',), 1) for content_type, fields in CARD_FIELDS.items()}
+SEARCH_PROJECTION = dict.fromkeys(sorted(set().union(*CARD_FIELDS.values(), ('updated_at',))), 1)
+
+# Type label stored on unified content documents and returned by search
+CONTENT_TYPE_NAMES = {
+    'jobs': 'job',
+    'workshops': 'workshop',
+    'courses': 'course',
+    'hackathons': 'hackathon'
+}
+
+# Checkbox fields, stored as booleans
+CONTENT_FLAGS = {
+    'workshops': ('certification',),
+    'courses': ('certification',),
+    'websites': ('is_project',),
+    'ads': ('active',)
+}
+AD_FLUSH_INTERVAL = 5  # seconds between ad telemetry flushes
+AD_FLUSH_THRESHOLD = 500  # buffered events that trigger an early flush
+
+# In-process ad telemetry buffers, drained to MongoDB in bulk
+_ad_counters = Counter()  # (ad_id, field) -> increment
+_ad_click_events = []
+_ad_event_count = 0  # buffered events, compared against AD_FLUSH_THRESHOLD
+_ad_buffer_lock = threading.Lock()
+_ad_flush_timer = None
 
 # Helper Functions
 def login_required(f):
@@ -113,83 +370,217 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-@lru_cache(maxsize=128)
-def time_ago(posted_at_str):
-    """Convert datetime to relative time string with caching"""
-    if isinstance(posted_at_str, str):
-        posted_at = datetime.fromisoformat(posted_at_str)
-    else:
-        posted_at = posted_at_str
-    
-    now = datetime.utcnow()
-    diff = now - posted_at
-    
-    seconds = diff.total_seconds()
+def time_ago(posted_at, now):
+    """Convert datetime to relative time string against a precomputed now"""
+    seconds = (now - posted_at).total_seconds()
     if seconds < 60:
         return "Just now"
     elif seconds < 3600:
-        minutes = int(seconds / 60)
+        minutes = int(seconds // 60)
         return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
     elif seconds < 86400:
-        hours = int(seconds / 3600)
+        hours = int(seconds // 3600)
         return f"{hours} hour{'s' if hours > 1 else ''} ago"
     elif seconds < 604800:
-        days = int(seconds / 86400)
+        days = int(seconds // 86400)
         return f"{days} day{'s' if days > 1 else ''} ago"
     elif seconds < 2592000:
-        weeks = int(seconds / 604800)
+        weeks = int(seconds // 604800)
         return f"{weeks} week{'s' if weeks > 1 else ''} ago"
     else:
-        months = int(seconds / 2592000)
+        months = int(seconds // 2592000)
         return f"{months} month{'s' if months > 1 else ''} ago"
 
+def time_ago_expression():
+    """Aggregation expression mirroring time_ago, evaluated against the server clock"""
+    def ago(seconds, unit):
+        count = {'$toLong': {'$floor': {'$divide': ['$$age', seconds]}}}
+        return {'$concat': [{'$toString': count}, f' {unit}', {'$cond': [{'$gt': [count, 1]}, 's', '']}, ' ago']}
+    
+    buckets = [(60, 3600, 'minute'), (3600, 86400, 'hour'), (86400, 604800, 'day'), (604800, 2592000, 'week')]
+    return {'$let': {
+        'vars': {'age': {'$dateDiff': {'startDate': '$posted_at', 'endDate': '$$NOW', 'unit': 'second'}}},
+        'in': {'$switch': {
+            'branches': [{'case': {'$lt': ['$$age', 60]}, 'then': 'Just now'}] + [
+                {'case': {'$lt': ['$$age', limit]}, 'then': ago(seconds, unit)}
+                for seconds, limit, unit in buckets
+            ],
+            'default': ago(2592000, 'month')
+        }}
+    }}
+
 def validate_email(email):
     """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_RE.match(email) is not None
 
 def sanitize_input(text):
     """Sanitize user input to prevent XSS"""
     if not text:
         return text
-    return text.replace('<', '&lt;').replace('>', '&gt;')
+    return text.translate(XSS_TABLE)
 
 def upload_to_cloudinary(file):
     """Upload file to Cloudinary with optimizations"""
+    # Fallback for when the direct browser upload is unavailable; only Cloudinary's
+    # own errors are swallowed so programming errors still surface
     try:
         result = cloudinary.uploader.upload(
             file,
-            folder="community_platform",
+            folder=CLOUDINARY_FOLDER,
             quality="auto:good",
             fetch_format="auto",
             width=800,
             crop="limit"
         )
         return result['secure_url']
-    except Exception as e:
-        print(f"Cloudinary upload error: {e}")
+    except cloudinary.exceptions.Error:
+        app.logger.exception("Cloudinary upload error")
         return None
 
+def run_in_transaction(callback):
+    """Run callback(session) in a transaction when the deployment supports one"""
+    # Multi-document transactions need a replica set or sharded cluster
+    if mongo_client.topology_description.topology_type_name not in ('ReplicaSetWithPrimary', 'Sharded'):
+        return callback(None)
+    with mongo_client.start_session() as session:
+        return session.with_transaction(callback)
+
+def build_content_data(content_type):
+    """Build a content document in one pass over the allowed form fields"""
+    data = {}
+    for key in CONTENT_FIELDS[content_type]:
+        value = request.form.get(key)
+        if value is not None:
+            data[key] = set_default_value(sanitize_input(value))
+    
+    for key in CONTENT_FLAGS.get(content_type, ()):
+        data[key] = request.form.get(key) == 'on'
+    
+    # Lowercased copy so location filters can use an anchored index scan
+    if 'location' in data:
+        data['location_lc'] = data['location'].lower()
+    
+    if data.get('requirements', 'N/A') != 'N/A':
+        data['requirements'] = [r.strip() for r in data['requirements'].split(',') if r.strip()]
+    
+    return data
+
+def get_image_url():
+    """Get the image URL from a direct browser upload, or upload the file server-side"""
+    image_url = request.form.get('image_url', '').strip()
+    if image_url:
+        return image_url if image_url.startswith(CLOUDINARY_URL_PREFIX) else None
+    
+    file = request.files.get('image')
+    if file and file.filename:
+        return upload_to_cloudinary(file)
+    return None
+
+def mirror_content(content_type, query):
+    """Copy matching documents into the unified content collection, server-side"""
+    collection_map = {
+        'jobs': jobs_collection,
+        'workshops': workshops_collection,
+        'courses': courses_collection,
+        'hackathons': hackathons_collection
+    }
+    collection_map[content_type].aggregate([
+        {'$match': query},
+        {'$unset': 'admin_id'},
+        {'$set': {'type': CONTENT_TYPE_NAMES[content_type]}},
+        {'$merge': {'into': content_collection.name, 'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+    ])
+
 def set_default_value(value, default="N/A"):
     """Set default value if field is empty"""
     if value is None or (isinstance(value, str) and value.strip() == ''):
         return default
     return value
 
-def get_pagination_data(page, total_items):
-    """Calculate pagination data"""
-    total_pages = (total_items + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
-    has_prev = page > 1
-    has_next = page < total_pages
-    return {
-        'page': page,
-        'total_pages': total_pages,
+def invalidate_content_cache():
+    """Drop cached listings, active ads and dashboard stats after a content change"""
+    cache.delete_memoized(get_cached_content)
+    cache.delete_memoized(get_active_ads)
+    cache.delete_memoized(get_filtered_content)
+    cache.delete_memoized(get_search_results)
+    cache.delete('admin_dashboard_stats')
+
+def encode_cursor(doc, field='posted_at'):
+    """Build an opaque page cursor from the last document of a page"""
+    return f"{doc[field].isoformat()}_{doc['_id']}"
+
+def cursor_query(after, field='posted_at'):
+    """Build the keyset filter selecting documents that sort after the cursor"""
+    if not after:
+        return {}
+    try:
+        cursor_ts, cursor_id = after.rsplit('_', 1)
+        cursor_ts = datetime.fromisoformat(cursor_ts)
+        cursor_id = ObjectId(cursor_id)
+    except (ValueError, InvalidId):
+        return {}
+    return {'$or': [
+        {field: {'$lt': cursor_ts}},
+        {field: cursor_ts, '_id': {'$lt': cursor_id}}
+    ]}
+
+def paginate_cursor(cursor, after, field='posted_at'):
+    """Read one keyset page from a sorted cursor and build pagination data"""
+    return paginate_items(list(cursor.sort([(field, DESCENDING), ('_id', DESCENDING)]).limit(ITEMS_PER_PAGE + 1)), bool(after), field)
+
+def paginate_items(items, has_prev, field='posted_at'):
+    """Trim a page fetched with one extra document and build pagination data"""
+    has_next = len(items) > ITEMS_PER_PAGE
+    items = items[:ITEMS_PER_PAGE]
+    return items, {
         'has_prev': has_prev,
         'has_next': has_next,
-        'prev_page': page - 1 if has_prev else None,
-        'next_page': page + 1 if has_next else None
+        'next_cursor': encode_cursor(items[-1], field) if has_next else None
     }
 
+def json_response(payload, status=200):
+    """Build a JSON response directly from orjson bytes for hot endpoints"""
+    return app.response_class(dump_json(payload), status=status, mimetype='application/json')
+
+def listing_etag(content_type, items, pagination):
+    """Build an ETag for a listing page from its documents and the viewer"""
+    versions = [(str(item['_id']), item.get('updated_at', item['posted_at'])) for item in items]
+    # The bucket matches the listing cache TTL so relative times refresh with it
+    source = f"{content_type}:{pagination['next_cursor']}:{versions}:{session.get('user_id')}:{int(time.time() // CACHE_TIMEOUT)}"
+    return hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+
+def client_has_etag(etag):
+    """Check If-None-Match, ignoring the encoding suffix Flask-Compress appends to ETags"""
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return True
+    # A compressed response carries "tag:br" or "tag:gzip", which the client echoes back
+    return etag in {COMPRESSED_ETAG_SUFFIX.sub('', tag) for tag in if_none_match.as_set(include_weak=True)}
+
+def render_conditional(etag, template, **context):
+    """Render a template, or answer 304 without rendering when the client's copy is current"""
+    if client_has_etag(etag):
+        response = app.response_class(status=304)
+    else:
+        response = make_response(render_template(template, **context))
+    response.set_etag(etag)
+    return response
+
+def results_etag(key, items):
+    """Build an ETag for API results from the normalized request and returned documents"""
+    versions = [(str(item['_id']), item.get('updated_at', item['posted_at']), item.get('time_ago')) for item in items]
+    return hashlib.blake2b(f"{key}:{versions}".encode(), digest_size=8).hexdigest()
+
+def respond_conditional(etag, build_response):
+    """Build a JSON response, or answer 304 without encoding when the client's copy is current"""
+    if client_has_etag(etag):
+        response = app.response_class(status=304)
+    else:
+        response = build_response()
+    # Weak: the body is equivalent, not byte-identical, across compression and encoders
+    response.set_etag(etag, weak=True)
+    return response
+
 # Authentication Routes
 @app.route('/')
 def index():
@@ -206,7 +597,7 @@ def login():
         password = request.form.get('password', '')
         
         # Check if admin login
-        if email == ADMIN_USERNAME and password == ADMIN_PASSWORD:
+        if email == ADMIN_USERNAME and check_password_hash(ADMIN_PASSWORD_HASH, password):
             session['user_id'] = 'admin'
             session['is_admin'] = True
             session['username'] = 'Admin'
@@ -220,6 +611,7 @@ def login():
         )
         if user and check_password_hash(user['password'], password):
             session['user_id'] = str(user['_id'])
+            session['user_oid'] = user['_id'].binary
             session['is_admin'] = False
             session['username'] = user['name']
             flash('Login successful!', 'success')
@@ -264,7 +656,7 @@ def register():
             flash('Email already registered', 'danger')
             return render_template('register.html')
         
-        hashed_password = generate_password_hash(password)
+        hashed_password = generate_password_hash(password, method='scrypt')
         user_data = {
             'name': name,
             'email': email,
@@ -278,6 +670,7 @@ def register():
         result = users_collection.insert_one(user_data)
         
         session['user_id'] = str(result.inserted_id)
+        session['user_oid'] = result.inserted_id.binary
         session['is_admin'] = False
         session['username'] = name
         
@@ -302,8 +695,10 @@ def logout():
 @login_required
 def user_dashboard():
     # Only fetch necessary fields
+    # Raw ObjectId bytes skip hex parsing; sessions from before user_oid fall back to user_id
+    user_oid = ObjectId(session['user_oid']) if 'user_oid' in session else ObjectId(session['user_id'])
     user = users_collection.find_one(
-        {'_id': ObjectId(session['user_id'])},
+        {'_id': user_oid},
         {'password': 0}  # Exclude password
     )
     return render_template('user_dashboard.html', user=user)
@@ -311,37 +706,41 @@ def user_dashboard():
 # Admin Dashboard
 @app.route('/admin/dashboard')
 @admin_required
-@cache.cached(timeout=60)  # Cache for 1 minute
+@cache.cached(timeout=60, key_prefix='admin_dashboard_stats')  # Cache for 1 minute
 def admin_dashboard():
     """Admin dashboard with cached statistics"""
-    stats = {
-        'total_users': users_collection.estimated_document_count(),
-        'total_jobs': jobs_collection.estimated_document_count(),
-        'total_workshops': workshops_collection.estimated_document_count(),
-        'total_courses': courses_collection.estimated_document_count(),
-        'total_hackathons': hackathons_collection.estimated_document_count(),
-        'total_roadmaps': roadmaps_collection.estimated_document_count(),
-        'total_websites': websites_collection.estimated_document_count(),
-        'total_ads': ads_collection.estimated_document_count(),
-        'active_ads': ads_collection.count_documents({'active': True}),
-        'total_ad_clicks': ad_clicks_collection.estimated_document_count()
+    counters = {
+        'total_users': users_collection.estimated_document_count,
+        'total_jobs': jobs_collection.estimated_document_count,
+        'total_workshops': workshops_collection.estimated_document_count,
+        'total_courses': courses_collection.estimated_document_count,
+        'total_hackathons': hackathons_collection.estimated_document_count,
+        'total_roadmaps': roadmaps_collection.estimated_document_count,
+        'total_websites': websites_collection.estimated_document_count,
+        'total_ads': ads_collection.estimated_document_count,
+        # Served by the ('active', 'clicks') index prefix
+        'active_ads': lambda: ads_collection.count_documents({'active': True}),
+        'total_ad_clicks': ad_clicks_collection.estimated_document_count
     }
+    
+    # Issue all counts concurrently so the page costs ~1 round-trip instead of 10. The pool
+    # belongs to this request (greenlets under gevent), so loads never queue behind each other
+    with ThreadPoolExecutor(max_workers=len(counters)) as pool:
+        futures = {key: pool.submit(count) for key, count in counters.items()}
+        stats = {key: future.result() for key, future in futures.items()}
     return render_template('admin_dashboard.html', stats=stats)
 
 @app.route('/admin/users')
 @admin_required
 def admin_users():
     """View paginated users"""
-    page = request.args.get('page', 1, type=int)
-    skip = (page - 1) * ITEMS_PER_PAGE
+    after = request.args.get('after')
     
-    total_users = users_collection.estimated_document_count()
-    users = list(users_collection.find(
-        {},
+    users, pagination = paginate_cursor(users_collection.find(
+        cursor_query(after, 'created_at'),
         {'password': 0}  # Exclude passwords
-    ).sort('created_at', DESCENDING).skip(skip).limit(ITEMS_PER_PAGE))
+    ), after, 'created_at')
     
-    pagination = get_pagination_data(page, total_users)
     return render_template('admin_dashboard.html', users=users, section='users', pagination=pagination)
 
 @app.route('/admin/content/<content_type>')
@@ -362,14 +761,11 @@ def admin_content(content_type):
         flash('Invalid content type', 'danger')
         return redirect(url_for('admin_dashboard'))
     
-    page = request.args.get('page', 1, type=int)
-    skip = (page - 1) * ITEMS_PER_PAGE
+    after = request.args.get('after')
     
     collection = collection_map[content_type]
-    total_items = collection.estimated_document_count()
-    content = list(collection.find().sort('posted_at', DESCENDING).skip(skip).limit(ITEMS_PER_PAGE))
+    content, pagination = paginate_cursor(collection.find(cursor_query(after)), after)
     
-    pagination = get_pagination_data(page, total_items)
     return render_template('admin_dashboard.html', content=content, content_type=content_type, section='content', pagination=pagination)
 
 @app.route('/admin/add/<content_type>', methods=['POST'])
@@ -389,38 +785,29 @@ def admin_add_content(content_type):
     if content_type not in collection_map:
         return jsonify({'error': 'Invalid content type'}), 400
     
-    data = request.form.to_dict()
+    data = build_content_data(content_type)
     
-    # Handle file upload
-    if 'image' in request.files:
-        file = request.files['image']
-        if file.filename:
-            image_url = upload_to_cloudinary(file)
-            data['image'] = image_url
-    
-    # Sanitize inputs
-    for key in data:
-        if isinstance(data[key], str):
-            data[key] = sanitize_input(data[key])
-            data[key] = set_default_value(data[key])
+    # Handle image upload
+    image_url = get_image_url()
+    if image_url:
+        data['image'] = image_url
     
     data['posted_at'] = datetime.utcnow()
     data['admin_id'] = session['user_id']
     
     promote_as_ad = request.form.get('promote_as_ad') == 'on'
     
-    if 'certification' in data:
-        data['certification'] = data['certification'] == 'on'
-    if 'active' in data:
-        data['active'] = data['active'] == 'on'
-    
-    if 'requirements' in data and data['requirements'] != 'N/A':
-        data['requirements'] = [r.strip() for r in data['requirements'].split(',') if r.strip()]
+    if promote_as_ad:
+        # Pre-allocate the ad id so the content document records it in the same insert
+        ad_id = ObjectId()
+        data['has_ad'] = True
+        data['ad_id'] = ad_id
     
     result = collection_map[content_type].insert_one(data)
     
     if promote_as_ad:
         ad_data = {
+            '_id': ad_id,
             'title': data.get('company_name') or data.get('name') or data.get('title', 'N/A'),
             'description': data.get('role') or data.get('description', 'N/A')[:100],
             'image': data.get('image', ''),
@@ -435,9 +822,11 @@ def admin_add_content(content_type):
         }
         ads_collection.insert_one(ad_data)
     
-    # Clear relevant caches
-    cache.delete_memoized(get_cached_content, content_type, 1)
-    cache.clear()
+    if content_type in CONTENT_TYPE_NAMES:
+        mirror_content(content_type, {'_id': result.inserted_id})
+    
+    # Clear caches
+    invalidate_content_cache()
     
     flash(f'{content_type.capitalize()} added successfully!', 'success')
     return redirect(url_for('admin_content', content_type=content_type))
@@ -463,47 +852,16 @@ def admin_edit_content(content_type, id):
     collection = collection_map[content_type]
     
     if request.method == 'POST':
-        data = request.form.to_dict()
+        data = build_content_data(content_type)
         
-        if 'image' in request.files:
-            file = request.files['image']
-            if file.filename:
-                image_url = upload_to_cloudinary(file)
-                if image_url:
-                    data['image'] = image_url
+        image_url = get_image_url()
+        if image_url:
+            data['image'] = image_url
         
         promote_as_ad = request.form.get('promote_as_ad') == 'on'
         
-        if 'promote_as_ad' in data:
-            del data['promote_as_ad']
-        
-        for key in list(data.keys()):
-            if isinstance(data[key], str):
-                data[key] = sanitize_input(data[key])
-                data[key] = set_default_value(data[key])
-        
-                if 'certification' in data:
-                    data['certification'] = data['certification'] == 'on'
-                else:
-                    data['certification'] = False
-
-                if 'active' in data:
-                    data['active'] = data['active'] == 'on'
-                else:
-                    data['active'] = False
-
-                if 'is_project' in data:
-                    data['is_project'] = data['is_project'] == 'on'
-                else:
-                    data['is_project'] = False
-        
-        if 'requirements' in data and data['requirements'] != 'N/A':
-            data['requirements'] = [r.strip() for r in data['requirements'].split(',') if r.strip()]
-        
         data['updated_at'] = datetime.utcnow()
         
-        collection.update_one({'_id': ObjectId(id)}, {'$set': data})
-        
         if content_type in ['jobs', 'workshops', 'courses', 'hackathons']:
             if promote_as_ad:
                 ad_data = {
@@ -518,18 +876,34 @@ def admin_edit_content(content_type, id):
                     'admin_id': session['user_id']
                 }
                 
-                existing_ad = ads_collection.find_one({'content_reference': ObjectId(id)}, {'_id': 1})
+                # Atomic upsert: one round-trip, and the unique content_reference index
+                # keeps concurrent edits from inserting duplicate ads
+                new_ad_id = ObjectId()
+                ad = ads_collection.find_one_and_update(
+                    {'content_reference': ObjectId(id)},
+                    {
+                        '$set': ad_data,
+                        '$setOnInsert': {
+                            '_id': new_ad_id,
+                            'clicks': 0,
+                            'impressions': 0,
+                            'posted_at': datetime.utcnow()
+                        }
+                    },
+                    projection={'_id': 1},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
                 
-                if existing_ad:
-                    ads_collection.update_one({'_id': existing_ad['_id']}, {'$set': ad_data})
-                    flash(f'{content_type.capitalize()} and ad updated successfully!', 'success')
-                else:
-                    ad_data['clicks'] = 0
-                    ad_data['impressions'] = 0
-                    ad_data['posted_at'] = datetime.utcnow()
-                    ads_collection.insert_one(ad_data)
+                if ad['_id'] == new_ad_id:
                     flash(f'{content_type.capitalize()} updated and ad created!', 'success')
+                else:
+                    flash(f'{content_type.capitalize()} and ad updated successfully!', 'success')
+                data['has_ad'] = True
+                data['ad_id'] = ad['_id']
             else:
+                data['has_ad'] = False
+                data['ad_id'] = None
                 result = ads_collection.delete_many({'content_reference': ObjectId(id)})
                 if result.deleted_count > 0:
                     flash(f'{content_type.capitalize()} updated (ad removed)!', 'success')
@@ -538,22 +912,44 @@ def admin_edit_content(content_type, id):
         else:
             flash(f'{content_type.capitalize()} updated successfully!', 'success')
         
+        # Ad state is written with the content so the edit form needs no ads lookup
+        collection.update_one({'_id': ObjectId(id)}, {'$set': data})
+        
+        if content_type in CONTENT_TYPE_NAMES:
+            mirror_content(content_type, {'_id': ObjectId(id)})
+        
         # Clear caches
-        cache.delete_memoized(get_cached_content, content_type, 1)
-        cache.clear()
+        invalidate_content_cache()
         
         return redirect(url_for('admin_content', content_type=content_type))
     
     item = collection.find_one({'_id': ObjectId(id)})
     
     if content_type in ['jobs', 'workshops', 'courses', 'hackathons']:
-        existing_ad = ads_collection.find_one({'content_reference': ObjectId(id)}, {'_id': 1})
-        item['has_ad'] = existing_ad is not None
+        if 'has_ad' not in item:
+            # Documents written before has_ad was tracked fall back to the indexed lookup
+            existing_ad = ads_collection.find_one({'content_reference': ObjectId(id)}, {'_id': 1})
+            item['has_ad'] = existing_ad is not None
     else:
         item['has_ad'] = False
     
     return render_template('admin_dashboard.html', item=item, content_type=content_type, section='edit')
 
+@app.route('/admin/upload-signature', methods=['POST'])
+@admin_required
+def admin_upload_signature():
+    """Sign a direct browser-to-Cloudinary upload so files bypass the app server"""
+    config = cloudinary.config()
+    params = {
+        'folder': CLOUDINARY_FOLDER,
+        'timestamp': int(time.time()),
+        'transformation': CLOUDINARY_TRANSFORMATION
+    }
+    params['signature'] = cloudinary.utils.api_sign_request(params, config.api_secret)
+    params['api_key'] = config.api_key
+    params['cloud_name'] = config.cloud_name
+    return jsonify(params)
+
 @app.route('/admin/delete/<content_type>/<id>', methods=['POST'])
 @admin_required
 def admin_delete_content(content_type, id):
@@ -571,20 +967,41 @@ def admin_delete_content(content_type, id):
     if content_type not in collection_map:
         return jsonify({'error': 'Invalid content type'}), 400
     
-    collection_map[content_type].delete_one({'_id': ObjectId(id)})
-    ads_collection.delete_many({'content_reference': ObjectId(id)})
+    content_id = ObjectId(id)
+    
+    def delete_content(session):
+        if content_type == 'ads':
+            # Clear the promoted flag on the content the ad pointed to
+            ad = ads_collection.find_one_and_delete(
+                {'_id': content_id},
+                {'content_type': 1, 'content_reference': 1},
+                session=session
+            )
+            if ad and ad.get('content_type') in collection_map and ad.get('content_reference'):
+                collection_map[ad['content_type']].update_one(
+                    {'_id': ad['content_reference']},
+                    {'$set': {'has_ad': False, 'ad_id': None}},
+                    session=session
+                )
+        else:
+            collection_map[content_type].delete_one({'_id': content_id}, session=session)
+            ads_collection.delete_many({'content_reference': content_id}, session=session)
+            if content_type in CONTENT_TYPE_NAMES:
+                content_collection.delete_one({'_id': content_id}, session=session)
+    
+    # Content and its ads are removed together, never leaving orphaned ads
+    run_in_transaction(delete_content)
     
     # Clear caches
-    cache.delete_memoized(get_cached_content, content_type, 1)
-    cache.clear()
+    invalidate_content_cache()
     
     flash(f'{content_type.capitalize()} deleted successfully!', 'success')
     return redirect(url_for('admin_content', content_type=content_type))
 
 # Cached content fetching
 @cache.memoize(timeout=CACHE_TIMEOUT)
-def get_cached_content(content_type, page=1):
-    """Get cached paginated content"""
+def get_cached_content(content_type, after=None):
+    """Get cached keyset-paginated content"""
     collection_map = {
         'jobs': jobs_collection,
         'workshops': workshops_collection,
@@ -593,69 +1010,42 @@ def get_cached_content(content_type, page=1):
     }
     
     if content_type not in collection_map:
-        return [], 0
-    
-    skip = (page - 1) * ITEMS_PER_PAGE
-    collection = collection_map[content_type]
+        return [], {'has_prev': False, 'has_next': False, 'next_cursor': None}
     
-    # Use projection to exclude unnecessary fields
-    items = list(collection.find(
-        {},
+    # Each page is an index range scan on (posted_at, _id), independent of depth
+    return paginate_cursor(collection_map[content_type].find(
+        cursor_query(after),
         {'admin_id': 0}  # Exclude admin_id from public view
-    ).sort('posted_at', DESCENDING).skip(skip).limit(ITEMS_PER_PAGE))
-    
-    total = collection.estimated_document_count()
-    
-    return items, total
+    ), after)
 
 # Public Content Pages with Pagination
 @app.route('/jobs')
 def jobs():
     """Jobs and internships page with pagination"""
-    page = request.args.get('page', 1, type=int)
-    all_jobs, total = get_cached_content('jobs', page)
-    
-    for job in all_jobs:
-        job['time_ago'] = time_ago(str(job['posted_at']))
-    
-    pagination = get_pagination_data(page, total)
-    return render_template('jobs.html', jobs=all_jobs, pagination=pagination)
+    all_jobs, pagination = get_cached_content('jobs', request.args.get('after'))
+    etag = listing_etag('jobs', all_jobs, pagination)
+    return render_conditional(etag, 'jobs.html', jobs=all_jobs, pagination=pagination, now=datetime.utcnow())
 
 @app.route('/workshops')
 def workshops():
     """Workshops page with pagination"""
-    page = request.args.get('page', 1, type=int)
-    all_workshops, total = get_cached_content('workshops', page)
-    
-    for workshop in all_workshops:
-        workshop['time_ago'] = time_ago(str(workshop['posted_at']))
-    
-    pagination = get_pagination_data(page, total)
-    return render_template('workshops.html', workshops=all_workshops, pagination=pagination)
+    all_workshops, pagination = get_cached_content('workshops', request.args.get('after'))
+    etag = listing_etag('workshops', all_workshops, pagination)
+    return render_conditional(etag, 'workshops.html', workshops=all_workshops, pagination=pagination, now=datetime.utcnow())
 
 @app.route('/courses')
 def courses():
     """Courses page with pagination"""
-    page = request.args.get('page', 1, type=int)
-    all_courses, total = get_cached_content('courses', page)
-    
-    for course in all_courses:
-        course['time_ago'] = time_ago(str(course['posted_at']))
-    
-    pagination = get_pagination_data(page, total)
-    return render_template('courses.html', courses=all_courses, pagination=pagination)
+    all_courses, pagination = get_cached_content('courses', request.args.get('after'))
+    etag = listing_etag('courses', all_courses, pagination)
+    return render_conditional(etag, 'courses.html', courses=all_courses, pagination=pagination, now=datetime.utcnow())
 
 @app.route('/hackathons')
 def hackathons():
     """Hackathons page with pagination"""
-    page = request.args.get('page', 1, type=int)
-    all_hackathons, total = get_cached_content('hackathons', page)
-    
-    for hackathon in all_hackathons:
-        hackathon['time_ago'] = time_ago(str(hackathon['posted_at']))
-    
-    pagination = get_pagination_data(page, total)
-    return render_template('hackathons.html', hackathons=all_hackathons, pagination=pagination)
+    all_hackathons, pagination = get_cached_content('hackathons', request.args.get('after'))
+    etag = listing_etag('hackathons', all_hackathons, pagination)
+    return render_conditional(etag, 'hackathons.html', hackathons=all_hackathons, pagination=pagination, now=datetime.utcnow())
 
 @app.route('/roadmaps')
 @login_required
@@ -692,29 +1082,30 @@ def detail_page(content_type, id):
         flash('Invalid content type', 'danger')
         return redirect(url_for('index'))
     
-    item = collection_map[content_type].find_one({'_id': ObjectId(id)}, {'admin_id': 0})
+    collection = collection_map[content_type]
+    item_id = ObjectId(id)
+    
+    item = collection.find_one({'_id': item_id}, {'admin_id': 0})
     if not item:
         flash('Content not found', 'danger')
         return redirect(url_for('index'))
     
-    item['time_ago'] = time_ago(str(item['posted_at']))
-    
-    # Get related content - limit fields and results
+    # Get related content - limit fields and results, newest first via the posted_at indexes
     if content_type == 'job':
-        related = list(collection_map[content_type].find(
+        related = list(collection.find(
             {
                 'job_type': item.get('job_type'),
-                '_id': {'$ne': ObjectId(id)}
+                '_id': {'$ne': item_id}
             },
             {'company_name': 1, 'role': 1, 'location': 1, 'posted_at': 1, 'image': 1}
-        ).limit(3))
+        ).sort('posted_at', DESCENDING).limit(3))
     else:
-        related = list(collection_map[content_type].find(
-            {'_id': {'$ne': ObjectId(id)}},
+        related = list(collection.find(
+            {'_id': {'$ne': item_id}},
             {'name': 1, 'organizer': 1, 'posted_at': 1, 'image': 1}
-        ).limit(3))
+        ).sort('posted_at', DESCENDING).limit(3))
     
-    return render_template('detail_page.html', item=item, content_type=content_type, related=related)
+    return render_template('detail_page.html', item=item, content_type=content_type, related=related, now=datetime.utcnow())
 
 # Apply Actions
 @app.route('/apply/<content_type>/<id>', methods=['POST'])
@@ -738,259 +1129,323 @@ def apply_content(content_type, id):
     return jsonify({'redirect_url': item.get('official_link', '#')})
 
 # Ad tracking
+def flush_ad_buffers():
+    """Write buffered ad impressions and clicks to MongoDB in bulk"""
+    global _ad_flush_timer, _ad_event_count
+    with _ad_buffer_lock:
+        counters = dict(_ad_counters)
+        click_events = list(_ad_click_events)
+        _ad_counters.clear()
+        _ad_click_events.clear()
+        _ad_event_count = 0
+        _ad_flush_timer = None
+    
+    increments = defaultdict(dict)
+    for (ad_id, field), count in counters.items():
+        increments[ad_id][field] = count
+    
+    try:
+        if increments:
+            ads_telemetry_collection.bulk_write([
+                UpdateOne({'_id': ad_id}, {'$inc': inc})
+                for ad_id, inc in increments.items()
+            ], ordered=False)
+        if click_events:
+            ad_clicks_collection.insert_many(click_events, ordered=False)
+    except PyMongoError:
+        app.logger.exception("Ad telemetry flush error")
+
+atexit.register(flush_ad_buffers)
+
+def buffer_ad_event(ad_id, field, click_event=None):
+    """Buffer an ad counter increment and schedule a bulk flush"""
+    global _ad_flush_timer, _ad_event_count
+    with _ad_buffer_lock:
+        _ad_counters[(ad_id, field)] += 1
+        if click_event:
+            _ad_click_events.append(click_event)
+        # Count events, not distinct counters, so a few busy ads still trigger a flush
+        _ad_event_count += 1
+        flush_now = _ad_event_count >= AD_FLUSH_THRESHOLD
+        if not flush_now and _ad_flush_timer is None:
+            _ad_flush_timer = threading.Timer(AD_FLUSH_INTERVAL, flush_ad_buffers)
+            _ad_flush_timer.daemon = True
+            _ad_flush_timer.start()
+    
+    if flush_now:
+        flush_ad_buffers()
+
 @app.route('/ad/impression/<ad_id>', methods=['POST'])
 def ad_impression(ad_id):
     """Track ad impressions"""
     try:
         if not ObjectId.is_valid(ad_id):
-            return jsonify({'success': False, 'error': 'Invalid ad ID'}), 400
-            
-        result = ads_collection.update_one(
-            {'_id': ObjectId(ad_id)},
-            {'$inc': {'impressions': 1}}
-        )
+            return json_response({'success': False, 'error': 'Invalid ad ID'}, 400)
         
-        if result.matched_count == 0:
-            return jsonify({'success': False, 'error': 'Ad not found'}), 404
-            
-        return jsonify({'success': True}), 200
-    except Exception as e:
-        print(f"Ad impression error: {e}")
-        return jsonify({'success': False, 'error': 'Server error'}), 500
+        buffer_ad_event(ObjectId(ad_id), 'impressions')
+        return json_response({'success': True})
+    except Exception:
+        app.logger.exception("Ad impression error")
+        return json_response({'success': False, 'error': 'Server error'}, 500)
 
 @app.route('/ad/click/<ad_id>', methods=['POST'])
 def ad_click(ad_id):
     """Track ad clicks"""
     try:
         if not ObjectId.is_valid(ad_id):
-            return jsonify({'success': False, 'error': 'Invalid ad ID'}), 400
-            
-        result = ads_collection.update_one(
-            {'_id': ObjectId(ad_id)},
-            {'$inc': {'clicks': 1}}
-        )
-        
-        if result.matched_count == 0:
-            return jsonify({'success': False, 'error': 'Ad not found'}), 404
+            return json_response({'success': False, 'error': 'Invalid ad ID'}, 400)
         
-        ad_clicks_collection.insert_one({
-            'ad_id': ObjectId(ad_id),
+        ad_oid = ObjectId(ad_id)
+        buffer_ad_event(ad_oid, 'clicks', {
+            'ad_id': ad_oid,
             'clicked_at': datetime.utcnow(),
             'user_id': session.get('user_id'),
             'ip_address': request.remote_addr
         })
-        
-        return jsonify({'success': True}), 200
-    except Exception as e:
-        print(f"Ad click error: {e}")
-        return jsonify({'success': False, 'error': 'Server error'}), 500
+        return json_response({'success': True})
+    except Exception:
+        app.logger.exception("Ad click error")
+        return json_response({'success': False, 'error': 'Server error'}, 500)
 
 
+@cache.memoize(timeout=30)
+def get_active_ads():
+    """Get the full list of active ads, cached briefly and shared across requests"""
+    ads = list(ads_collection.find(
+        {'active': True},
+        {'title': 1, 'description': 1, 'image': 1, 'link': 1, 'clicks': 1}
+    ))
+    
+    # Fill defaults once per cache fill; ObjectIds are stringified by the JSON encoder
+    for ad in ads:
+        ad['title'] = ad.get('title', 'Opportunity')
+        ad['description'] = ad.get('description', '')
+        ad['image'] = ad.get('image', '')
+        ad['link'] = ad.get('link', '#')
+    return ads
+
 @app.route('/api/get-ads')
-def get_ads():  # Note: Removed caching for true rotation
+def get_ads():
     """Get active ads in rotating order"""
     try:
-        # Use MongoDB aggregation with $sample for random selection
-        ads = list(ads_collection.aggregate([
-            {'$match': {'active': True}},
-            {'$sample': {'size': 5}},
-            {'$project': {
-                'title': 1, 
-                'description': 1, 
-                'image': 1, 
-                'link': 1, 
-                'clicks': 1
-            }}
-        ]))
-        
-        # Convert ObjectIds to strings
-        for ad in ads:
-            ad['_id'] = str(ad['_id'])
-            if 'content_reference' in ad:
-                ad['content_reference'] = str(ad['content_reference'])
-            ad['title'] = ad.get('title', 'Opportunity')
-            ad['description'] = ad.get('description', '')
-            ad['image'] = ad.get('image', '')
-            ad['link'] = ad.get('link', '#')
-        
-        return jsonify(ads)
-    except Exception as e:
-        print(f"Get ads error: {e}")
-        return jsonify([])
-        
-        return jsonify(ads)
-    except Exception as e:
-        print(f"Get ads error: {e}")
+        # Rotate in-process over the cached pool instead of a $sample per request
+        pool = get_active_ads()
+        return jsonify(random.sample(pool, min(5, len(pool))))
+    except Exception:
+        app.logger.exception("Get ads error")
         return jsonify([])
 
 # Filters & Search with optimized queries
-@app.route('/api/filter/<content_type>')
-def filter_content(content_type):
-    """Filter content based on query parameters"""
+@lru_cache(maxsize=1)
+def date_cutoffs(minute_bucket):
+    """Date filter cutoffs, recomputed once per minute bucket"""
+    now = datetime.utcnow()
+    return {
+        '24h': now - timedelta(hours=24),
+        'week': now - timedelta(days=7),
+        'month': now - timedelta(days=30)
+    }
+
+@cache.memoize(timeout=COUNT_CACHE_TIMEOUT)
+def approx_count(content_type):
+    """Approximate collection size from metadata, refreshed every few minutes"""
+    collection_map = {
+        'jobs': jobs_collection,
+        'workshops': workshops_collection,
+        'courses': courses_collection,
+        'hackathons': hackathons_collection
+    }
+    return collection_map[content_type].estimated_document_count()
+
+@cache.memoize(timeout=QUERY_CACHE_TIMEOUT)
+def get_filtered_content(content_type, location=None, price=None, date=None, job_type=None, experience=None, after=None, page=1):
+    """Get cached filter results and pagination for normalized filter arguments"""
     collection_map = {
         'jobs': jobs_collection,
         'workshops': workshops_collection,
         'courses': courses_collection,
         'hackathons': hackathons_collection
     }
-    
-    if content_type not in collection_map:
-        return jsonify({'error': 'Invalid content type'}), 400
     
     # Build filter query
     query = {}
     
-    if request.args.get('location'):
-        query['location'] = {'$regex': request.args.get('location'), '$options': 'i'}
+    if location:
+        # Anchored prefix match on the lowercased field stays on the location_lc index
+        query['location_lc'] = {'$regex': f'^{re.escape(location)}'}
     
-    if request.args.get('price'):
-        query['price'] = request.args.get('price')
+    if price:
+        query['price'] = price
     
-    if request.args.get('date'):
-        date_filter = request.args.get('date')
-        now = datetime.utcnow()
-        if date_filter == '24h':
-            query['posted_at'] = {'$gte': now - timedelta(hours=24)}
-        elif date_filter == 'week':
-            query['posted_at'] = {'$gte': now - timedelta(days=7)}
-        elif date_filter == 'month':
-            query['posted_at'] = {'$gte': now - timedelta(days=30)}
+    if date:
+        cutoff = date_cutoffs(int(time.time() // 60)).get(date)
+        if cutoff:
+            query['posted_at'] = {'$gte': cutoff}
     
-    if request.args.get('job_type'):
-        query['job_type'] = request.args.get('job_type')
+    if job_type:
+        query['job_type'] = job_type
     
-    if request.args.get('experience'):
-        query['required_experience'] = request.args.get('experience')
+    if experience:
+        query['required_experience'] = experience
     
-    # Pagination for filter results
-    page = request.args.get('page', 1, type=int)
-    skip = (page - 1) * ITEMS_PER_PAGE
+    # Keyset pagination: deep pages cost the same as the first
+    query.update(cursor_query(after))
     
-    # Execute query with projection
-    results = list(collection_map[content_type].find(
-        query,
-        {'admin_id': 0}
-    ).sort('posted_at', DESCENDING).skip(skip).limit(ITEMS_PER_PAGE))
+    pipeline = [{'$match': query}, {'$sort': {'posted_at': -1, '_id': -1}}]
+    if page > 1:
+        # Legacy page links; the caller caps page at MAX_PAGES
+        pipeline.append({'$skip': (page - 1) * ITEMS_PER_PAGE})
     
-    for item in results:
-        item['_id'] = str(item['_id'])
-        item['time_ago'] = time_ago(str(item['posted_at']))
+    # Hinting a missing index is a server error, so only hint indexes the probe has seen
+    # (deploys that skipped init-db still run unhinted)
+    collection = collection_map[content_type]
+    options = {}
+    hint = FILTER_HINTS[content_type].get(frozenset(field for field in FILTER_FIELDS if field in query))
+    if hint and hint in index_keys(collection.name):
+        # aggregate() passes hint through unconverted, and the server wants a document
+        options['hint'] = SON(hint)
+    
+    # Fetch only the fields the cards render, with relative times formatted by the server
+    # ($dateDiff needs MongoDB 5.0+; cached pages lag the clock by up to QUERY_CACHE_TIMEOUT)
+    return paginate_items(list(collection.aggregate(pipeline + [
+        {'$limit': ITEMS_PER_PAGE + 1},
+        {'$project': CARD_PROJECTIONS[content_type]},
+        {'$addFields': {'time_ago': time_ago_expression()}}
+    ], **options)), bool(after) or page > 1)
+
+@app.route('/api/filter/<content_type>')
+def filter_content(content_type):
+    """Filter content based on query parameters"""
+    if content_type not in ('jobs', 'workshops', 'courses', 'hackathons'):
+        return jsonify({'error': 'Invalid content type'}), 400
     
-    return jsonify(results)
+    # Normalize arguments so equivalent requests share a cache entry
+    def arg(name):
+        return request.args.get(name, '').strip() or None
+    
+    # Old ?page= links still work, but only up to a bounded skip
+    after = arg('after')
+    page = 1
+    if not after and arg('page'):
+        try:
+            page = max(int(arg('page')), 1)
+        except ValueError:
+            return jsonify({'error': 'Invalid page'}), 400
+        max_page = min(approx_count(content_type) // ITEMS_PER_PAGE + 1, MAX_PAGES)
+        if page > max_page:
+            return jsonify({'error': 'Page out of range', 'max_page': max_page}), 400
+    
+    location = arg('location')
+    filters = {
+        'location': location.lower() if location else None,
+        'price': arg('price'),
+        'date': arg('date'),
+        'job_type': arg('job_type'),
+        'experience': arg('experience'),
+        'after': after,
+        'page': page
+    }
+    results, pagination = get_filtered_content(content_type, **filters)
+    etag = results_etag(f"{content_type}:{filters}", results)
+    
+    # The page is already a cached list, so one encoded buffer costs little and lets
+    # Flask-Compress compress it
+    return respond_conditional(etag, lambda: json_response({
+        'items': results,
+        'next_cursor': pagination['next_cursor']
+    }))
+
+def text_search_stages(query, type_name, content_type):
+    """Aggregation stages for the top text-search matches in one collection"""
+    return [
+        {'$match': {'$text': {'$search': query}}},
+        {'$sort': {'score': {'$meta': 'textScore'}}},
+        {'$limit': 5},
+        {'$project': {**CARD_PROJECTIONS[content_type], 'type': {'$literal': type_name}, 'score': {'$meta': 'textScore'}}},
+        {'$addFields': {'time_ago': time_ago_expression()}}
+    ]
+
+def regex_search(collection, type_name, content_type, fields, query):
+    """Fallback search for collections without a text index"""
+    # Escaped and anchored, so user input cannot run arbitrary patterns
+    pattern = re.compile(f'^{re.escape(query)}', re.IGNORECASE)
+    return list(collection.aggregate([
+        {'$match': {'$or': [{field: pattern} for field in fields]}},
+        {'$limit': 5},
+        {'$project': {**CARD_PROJECTIONS[content_type], 'type': {'$literal': type_name}}},
+        {'$addFields': {'time_ago': time_ago_expression()}}
+    ]))
+
+# Searchable collections: (collection, result type, content type, regex fallback fields)
+SEARCH_SPECS = [
+    (jobs_collection, 'job', 'jobs', ('company_name', 'role', 'job_type')),
+    (workshops_collection, 'workshop', 'workshops', ('name', 'organizer')),
+    (courses_collection, 'course', 'courses', ('name', 'instructor')),
+    (hackathons_collection, 'hackathon', 'hackathons', ('name', 'organizer'))
+]
+
+@cache.memoize(timeout=QUERY_CACHE_TIMEOUT)
+def get_search_results(query):
+    """Get cached search results for a normalized query"""
+    if UNIFIED_SEARCH:
+        # One text index and one scan across every content type, keeping the top 5 per
+        # type as the per-collection path does (pages filter the results by type)
+        return list(content_collection.aggregate([
+            {'$match': {'$text': {'$search': query}}},
+            {'$project': {**SEARCH_PROJECTION, 'type': 1, 'score': {'$meta': 'textScore'}}},
+            {'$setWindowFields': {
+                'partitionBy': '$type',
+                'sortBy': {'score': -1},
+                'output': {'rank': {'$documentNumber': {}}}
+            }},
+            {'$match': {'rank': {'$lte': 5}}},
+            {'$sort': {'score': -1}},
+            {'$unset': 'rank'},
+            {'$addFields': {'time_ago': time_ago_expression()}}
+        ]))
+    
+    # Pick text or regex search per collection from the cached index probe, so
+    # genuine database errors propagate instead of silently degrading to regex
+    text_sources, regex_sources = [], []
+    for spec in SEARCH_SPECS:
+        (text_sources if has_text_index(spec[0].name) else regex_sources).append(spec)
+    
+    # Collections without a text index fall back to regex, queried concurrently in a
+    # pool owned by this request (greenlets under gevent)
+    with ThreadPoolExecutor(max_workers=max(len(regex_sources), 1)) as pool:
+        futures = [
+            pool.submit(regex_search, collection, type_name, content_type, fields, query)
+            for collection, type_name, content_type, fields in regex_sources
+        ]
+        
+        results = []
+        if text_sources:
+            # One round-trip: the server runs every text search via $unionWith
+            (first, first_type, first_content_type, _), *others = text_sources
+            results = list(first.aggregate(
+                text_search_stages(query, first_type, first_content_type) + [
+                    {'$unionWith': {'coll': collection.name, 'pipeline': text_search_stages(query, type_name, content_type)}}
+                    for collection, type_name, content_type, _ in others
+                ]
+            ))
+        
+        for future in futures:
+            results.extend(future.result())
+    
+    return results
 
 @app.route('/api/search')
 def search():
     """Global search across all content with text indexes"""
-    query = request.args.get('q', '').strip()
+    # Normalize the query so equivalent searches share a cache entry
+    query = ' '.join(request.args.get('q', '').lower().split())
     
     if not query:
         return jsonify([])
     
-    results = []
-    
-    # Use text search indexes for better performance
-    search_query = {'$text': {'$search': query}}
-    projection = {'score': {'$meta': 'textScore'}, 'admin_id': 0}
-    
-    # Search in jobs
-    try:
-        jobs = list(jobs_collection.find(
-            search_query,
-            projection
-        ).sort([('score', {'$meta': 'textScore'})]).limit(5))
-        
-        for job in jobs:
-            job['_id'] = str(job['_id'])
-            job['type'] = 'job'
-            results.append(job)
-    except:
-        # Fallback to regex if text index not available
-        jobs = list(jobs_collection.find({
-            '$or': [
-                {'company_name': {'$regex': query, '$options': 'i'}},
-                {'role': {'$regex': query, '$options': 'i'}},
-                {'job_type': {'$regex': query, '$options': 'i'}}
-            ]
-        }, {'admin_id': 0}).limit(5))
-        
-        for job in jobs:
-            job['_id'] = str(job['_id'])
-            job['type'] = 'job'
-            results.append(job)
-    
-    # Search in workshops
-    try:
-        workshops = list(workshops_collection.find(
-            search_query,
-            projection
-        ).sort([('score', {'$meta': 'textScore'})]).limit(5))
-        
-        for workshop in workshops:
-            workshop['_id'] = str(workshop['_id'])
-            workshop['type'] = 'workshop'
-            results.append(workshop)
-    except:
-        workshops = list(workshops_collection.find({
-            '$or': [
-                {'name': {'$regex': query, '$options': 'i'}},
-                {'organizer': {'$regex': query, '$options': 'i'}}
-            ]
-        }, {'admin_id': 0}).limit(5))
-        
-        for workshop in workshops:
-            workshop['_id'] = str(workshop['_id'])
-            workshop['type'] = 'workshop'
-            results.append(workshop)
-    
-    # Search in courses
-    try:
-        courses = list(courses_collection.find(
-            search_query,
-            projection
-        ).sort([('score', {'$meta': 'textScore'})]).limit(5))
-        
-        for course in courses:
-            course['_id'] = str(course['_id'])
-            course['type'] = 'course'
-            results.append(course)
-    except:
-        courses = list(courses_collection.find({
-            '$or': [
-                {'name': {'$regex': query, '$options': 'i'}},
-                {'instructor': {'$regex': query, '$options': 'i'}}
-            ]
-        }, {'admin_id': 0}).limit(5))
-        
-        for course in courses:
-            course['_id'] = str(course['_id'])
-            course['type'] = 'course'
-            results.append(course)
-    
-    # Search in hackathons
-    try:
-        hackathons = list(hackathons_collection.find(
-            search_query,
-            projection
-        ).sort([('score', {'$meta': 'textScore'})]).limit(5))
-        
-        for hackathon in hackathons:
-            hackathon['_id'] = str(hackathon['_id'])
-            hackathon['type'] = 'hackathon'
-            results.append(hackathon)
-    except:
-        hackathons = list(hackathons_collection.find({
-            '$or': [
-                {'name': {'$regex': query, '$options': 'i'}},
-                {'organizer': {'$regex': query, '$options': 'i'}}
-            ]
-        }, {'admin_id': 0}).limit(5))
-        
-        for hackathon in hackathons:
-            hackathon['_id'] = str(hackathon['_id'])
-            hackathon['type'] = 'hackathon'
-            results.append(hackathon)
-    
-    return jsonify(results)
+    # Results arrive with time_ago already formatted by the server
+    results = get_search_results(query)
+    return respond_conditional(results_etag(f"search:{query}", results), lambda: jsonify(results))
 
 # Error Handlers
 @app.errorhandler(404)
@@ -1003,21 +1458,47 @@ def server_error(e):
 
 # Template Filters
 @app.template_filter('time_ago')
-def time_ago_filter(dt):
-    return time_ago(str(dt))
+def time_ago_filter(dt, now=None):
+    return time_ago(dt, now or datetime.utcnow())
+
+@lru_cache(maxsize=None)
+def static_version(filename):
+    """Modification time of a static file, used to version its URL"""
+    try:
+        return int(os.path.getmtime(os.path.join(app.static_folder, filename)))
+    except OSError:
+        return None
+
+@app.url_defaults
+def add_static_version(endpoint, values):
+    """Append ?v=<mtime> to url_for('static') so changed files get a new URL"""
+    if endpoint == 'static' and 'filename' in values:
+        version = static_version(values['filename'])
+        if version:
+            values.setdefault('v', version)
 
 # Cache control for static files
 @app.after_request
 def add_header(response):
     """Add cache headers for static files"""
-    if 'static' in request.path:
-        response.cache_control.max_age = 31536000  # 1 year
+    if request.endpoint == 'static':
+        # Flask's file handler sends no-cache, which would force revalidation anyway
+        response.cache_control.no_cache = None
         response.cache_control.public = True
+        if request.args.get('v'):
+            # Versioned URLs change with the file, so they never need revalidating
+            response.cache_control.max_age = 31536000  # 1 year
+            response.cache_control.immutable = True
+        else:
+            # Unversioned URLs (bookmarks, old pages) keep the same path across deploys
+            response.cache_control.max_age = 86400  # 1 day
     elif request.endpoint in ['jobs', 'workshops', 'courses', 'hackathons']:
         response.cache_control.max_age = 300  # 5 minutes
         response.cache_control.public = True
+        response.vary.add('Cookie')  # The navbar differs for logged-in users
     return response
 
 if __name__ == '__main__':
+    ensure_indexes()
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port)
\ No newline at end of file
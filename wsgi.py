@@ -0,0 +1,5 @@
+# Gevent must patch the standard library before pymongo and cloudinary import socket
+from gevent import monkey
+monkey.patch_all()
+
+from app import app  # noqa: E402,F401